@@ -1,21 +1,33 @@
 import os
+import functools
 import sqlite3
-import pandas as pd
 import json
 import tempfile
 import uuid
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, TYPE_CHECKING
 from mcp.server.fastmcp import FastMCP
 from mcp.server.fastmcp.prompts import base
-import openpyxl  # for Excel files
-import chardet  # for encoding detection
 
-mcp = FastMCP("Data Analysis Toolkit", dependencies=["pandas", "openpyxl", "chardet"])
+# pandas/numpy/chardet 等重量级依赖在用到时才导入，以缩短服务启动时间
+if TYPE_CHECKING:
+    import pandas as pd
+
+mcp = FastMCP("Data Analysis Toolkit", dependencies=["pandas", "numpy", "openpyxl", "chardet", "pyarrow"])
 
 # 全局数据库连接管理
 _db_connections = {}
 
+# 每个连接创建时应用的PRAGMA设置
+_SQLITE_PRAGMAS = (
+    "journal_mode=MEMORY",
+    "synchronous=OFF",
+    "temp_store=MEMORY",
+    "cache_size=-200000",
+    "mmap_size=268435456",
+    "locking_mode=EXCLUSIVE",
+)
+
 def get_or_create_db(db_name: str = "default") -> sqlite3.Connection:
     """
     获取或创建SQLite数据库连接
@@ -25,6 +37,10 @@ def get_or_create_db(db_name: str = "default") -> sqlite3.Connection:
         temp_dir = tempfile.gettempdir()
         db_path = os.path.join(temp_dir, f"data_analysis_{db_name}_{uuid.uuid4().hex[:8]}.db")
         conn = sqlite3.connect(db_path, check_same_thread=False)
+        # 该库只是临时目录下的分析缓存，数据不保证持久化：
+        # 关闭fsync和磁盘回滚日志，并使用200MB页缓存和256MB内存映射读取
+        for pragma in _SQLITE_PRAGMAS:
+            conn.execute(f"PRAGMA {pragma}")
         _db_connections[db_name] = {
             'connection': conn,
             'path': db_path,
@@ -32,22 +48,195 @@ def get_or_create_db(db_name: str = "default") -> sqlite3.Connection:
         }
     return _db_connections[db_name]['connection']
 
+@functools.lru_cache(maxsize=256)
+def _detect_encoding_cached(file_path: str, mtime_ns: int, size: int) -> str:
+    """
+    检测文件编码（按路径、修改时间和文件大小缓存，文件变化后自动失效）
+    """
+    with open(file_path, 'rb') as f:
+        raw_data = f.read(4096)  # 读取前4KB检测编码
+    
+    if raw_data.startswith(b'\xef\xbb\xbf'):
+        return 'utf-8-sig'
+    if raw_data.startswith((b'\xff\xfe', b'\xfe\xff')):
+        return 'utf-16'
+    if not raw_data or max(raw_data) < 0x80:
+        # 纯ASCII内容按UTF-8读取（ASCII是其子集），无需调用chardet
+        return 'utf-8'
+    import chardet
+    
+    return chardet.detect(raw_data)['encoding'] or 'utf-8'
+
 def detect_file_encoding(file_path: str) -> str:
     """
     检测文件编码
     """
     try:
-        with open(file_path, 'rb') as f:
-            raw_data = f.read(10000)  # 读取前10KB检测编码
-            result = chardet.detect(raw_data)
-            return result['encoding'] or 'utf-8'
+        stat = os.stat(file_path)
+        return _detect_encoding_cached(str(file_path), stat.st_mtime_ns, stat.st_size)
     except:
         return 'utf-8'
 
-def load_file_to_dataframe(file_path: str) -> pd.DataFrame:
+def _csv_read_options(encoding: str, delimiter: str, column_names=None, column_types=None) -> dict:
+    """
+    构造pyarrow CSV读取参数
+
+    Args:
+        column_names: 覆盖表头的列名（可选，指定时跳过文件首行表头）
+        column_types: 按列名指定的列类型（可选）
+    """
+    import pyarrow.csv as pacsv
+    
+    # UTF-8 系编码走 pyarrow 原生解码（自动跳过BOM），其余编码由其转码
+    if encoding.lower().replace('_', '-') in ('utf-8', 'utf8', 'utf-8-sig', 'ascii'):
+        encoding = 'utf8'
+    return {
+        "read_options": pacsv.ReadOptions(
+            encoding=encoding,
+            block_size=8 << 20,
+            column_names=column_names or [],
+            skip_rows=1 if column_names else 0
+        ),
+        "parse_options": pacsv.ParseOptions(delimiter=delimiter),
+        # 与 pandas 一致，空字符串字段视为缺失值
+        "convert_options": pacsv.ConvertOptions(strings_can_be_null=True, column_types=column_types or {})
+    }
+
+def _check_csv_schema(schema, encoding: str):
+    """
+    pyarrow 遇到无法按UTF-8解码的列会推断为binary，视为编码错误
+    """
+    import pyarrow as pa
+    
+    if any(pa.types.is_binary(field.type) or '\ufffd' in field.name for field in schema):
+        raise UnicodeError(f"编码 {encoding} 无法正确解码文件")
+
+def _csv_column_names(names) -> list:
+    """
+    按 pandas.read_csv 的规则整理表头：空列名补为 "Unnamed: i"，重复列名追加 ".1"、".2" 等后缀
+    """
+    names = list(names)
+    unnamed = set()
+    for i, name in enumerate(names):
+        if name == "":
+            names[i] = f"Unnamed: {i}"
+            unnamed.add(names[i])
+    
+    # 先处理有名称的列，再处理补名的列；后缀跳过表头中已存在的列名
+    counts = {}
+    loop_order = [i for i in range(len(names)) if names[i] not in unnamed]
+    loop_order += [i for i in range(len(names)) if names[i] in unnamed]
+    for i in loop_order:
+        name = old_name = names[i]
+        cur_count = counts.get(name, 0)
+        while cur_count > 0:
+            counts[old_name] = cur_count + 1
+            name = f"{old_name}.{cur_count}"
+            if name in names:
+                cur_count += 1
+            else:
+                cur_count = counts.get(name, 0)
+        names[i] = name
+        counts[name] = cur_count + 1
+    return names
+
+def _csv_text_column_types(schema, column_names) -> dict:
+    """
+    pyarrow 推断出的日期时间列改按字符串读取，保留文件中的原始文本（与 pandas 一致，不做时区换算和重新格式化）
+    """
+    import pyarrow as pa
+    
+    return {
+        name: pa.string()
+        for name, field in zip(column_names, schema)
+        if pa.types.is_temporal(field.type)
+    }
+
+def read_csv_table(file_path, encoding: str, delimiter: str = ','):
+    """
+    使用pyarrow多线程解析CSV/TSV文件，返回pyarrow.Table
+    """
+    import pyarrow.csv as pacsv
+    
+    table = pacsv.read_csv(file_path, **_csv_read_options(encoding, delimiter))
+    _check_csv_schema(table.schema, encoding)
+    column_names = _csv_column_names(table.schema.names)
+    column_types = _csv_text_column_types(table.schema, column_names)
+    if column_types:
+        # 含日期时间列时按字符串类型重新解析
+        table = pacsv.read_csv(file_path, **_csv_read_options(encoding, delimiter, column_names, column_types))
+    elif column_names != table.schema.names:
+        table = table.rename_columns(column_names)
+    return table
+
+def open_csv_stream(file_path, encoding: str, delimiter: str = ','):
+    """
+    以流式方式打开CSV/TSV文件，按数据块（约8MB）逐批产出RecordBatch
+    """
+    import pyarrow.csv as pacsv
+    
+    reader = pacsv.open_csv(file_path, **_csv_read_options(encoding, delimiter))
+    _check_csv_schema(reader.schema, encoding)
+    column_names = _csv_column_names(reader.schema.names)
+    column_types = _csv_text_column_types(reader.schema, column_names)
+    if column_types or column_names != reader.schema.names:
+        # 表头需要改名或含日期时间列时按修正后的参数重新打开（只多读取首个数据块）
+        reader = pacsv.open_csv(file_path, **_csv_read_options(encoding, delimiter, column_names, column_types))
+    return reader
+
+def read_csv_table_with_fallback(file_path, encoding: str, delimiter: str = ','):
+    """
+    按指定编码读取CSV/TSV，编码失败时依次尝试常见编码
+
+    编码以外的解析错误（pyarrow.ArrowInvalid，如行字段数不一致）直接抛出，由调用方处理
+    """
+    try:
+        return read_csv_table(file_path, encoding, delimiter)
+    except UnicodeError:
+        # 如果检测的编码失败，尝试常见编码
+        for enc in ['utf-8', 'gbk', 'gb2312', 'latin-1']:
+            try:
+                return read_csv_table(file_path, enc, delimiter)
+            except UnicodeError:
+                continue
+        raise ValueError("无法确定文件编码")
+
+def read_csv_dataframe_with_fallback(file_path, encoding: str, delimiter: str = ',') -> "pd.DataFrame":
+    """
+    使用pandas读取CSV/TSV，编码失败时依次尝试常见编码
+
+    用于pyarrow无法解析的文件：pandas 对字段数不足的行以NaN补齐
+    """
+    import pandas as pd
+    
+    try:
+        return pd.read_csv(file_path, sep=delimiter, encoding=encoding)
+    except UnicodeDecodeError:
+        for enc in ['utf-8', 'gbk', 'gb2312', 'latin-1']:
+            try:
+                return pd.read_csv(file_path, sep=delimiter, encoding=enc)
+            except UnicodeDecodeError:
+                continue
+        raise ValueError("无法确定文件编码")
+
+def _load_csv_to_dataframe(file_path, delimiter: str = ',') -> "pd.DataFrame":
+    """
+    读取CSV/TSV到DataFrame，优先使用pyarrow，其无法解析时退回pandas
+    """
+    import pyarrow as pa
+    
+    encoding = detect_file_encoding(str(file_path))
+    try:
+        return read_csv_table_with_fallback(file_path, encoding, delimiter).to_pandas()
+    except pa.ArrowInvalid:
+        return read_csv_dataframe_with_fallback(file_path, encoding, delimiter)
+
+def load_file_to_dataframe(file_path: str) -> "pd.DataFrame":
     """
     根据文件类型加载数据到DataFrame
     """
+    import pandas as pd
+    
     file_path = Path(file_path)
     
     if not file_path.exists():
@@ -56,20 +245,7 @@ def load_file_to_dataframe(file_path: str) -> pd.DataFrame:
     file_ext = file_path.suffix.lower()
     
     if file_ext == '.csv':
-        # 检测编码
-        encoding = detect_file_encoding(str(file_path))
-        try:
-            df = pd.read_csv(file_path, encoding=encoding)
-        except UnicodeDecodeError:
-            # 如果检测的编码失败，尝试常见编码
-            for enc in ['utf-8', 'gbk', 'gb2312', 'latin-1']:
-                try:
-                    df = pd.read_csv(file_path, encoding=enc)
-                    break
-                except:
-                    continue
-            else:
-                raise ValueError("无法确定文件编码")
+        df = _load_csv_to_dataframe(file_path)
     
     elif file_ext in ['.xlsx', '.xls']:
         df = pd.read_excel(file_path)
@@ -81,14 +257,243 @@ def load_file_to_dataframe(file_path: str) -> pd.DataFrame:
         df = pd.read_parquet(file_path)
     
     elif file_ext == '.tsv':
-        encoding = detect_file_encoding(str(file_path))
-        df = pd.read_csv(file_path, sep='\t', encoding=encoding)
+        df = _load_csv_to_dataframe(file_path, delimiter='\t')
     
     else:
         raise ValueError(f"不支持的文件格式: {file_ext}")
     
     return df
 
+def _quote_identifier(name: str) -> str:
+    """
+    为SQLite标识符加双引号转义
+    """
+    return '"' + str(name).replace('"', '""') + '"'
+
+def _is_numeric_type(declared_type: str) -> bool:
+    """
+    根据SQLite列声明类型判断是否为数值列（INTEGER/REAL亲和性）
+    """
+    declared_type = (declared_type or "").upper()
+    return "INT" in declared_type or any(t in declared_type for t in ("REAL", "FLOA", "DOUB"))
+
+def _numeric_columns(columns_info) -> list:
+    """
+    从 PRAGMA table_info 结果中取出数值列名
+    """
+    return [col[1] for col in columns_info if _is_numeric_type(col[2])]
+
+def _bulk_load(conn: sqlite3.Connection, table_name: str, columns, batches) -> int:
+    """
+    在单个事务中重建表并批量写入数据
+
+    Args:
+        columns: (列名, SQLite类型) 列表
+        batches: 行元组可迭代对象的可迭代对象
+    """
+    table = _quote_identifier(table_name)
+    column_defs = ", ".join(f"{_quote_identifier(name)} {col_type}" for name, col_type in columns)
+    placeholders = ", ".join("?" * len(columns))
+    insert_sql = f"INSERT INTO {table} VALUES ({placeholders})"
+    
+    row_count = 0
+    conn.execute("BEGIN")
+    try:
+        conn.execute(f"DROP TABLE IF EXISTS {table}")
+        conn.execute(f"CREATE TABLE {table} ({column_defs})")
+        for rows in batches:
+            cursor = conn.executemany(insert_sql, rows)
+            row_count += max(cursor.rowcount, 0)
+        conn.execute("COMMIT")
+    except:
+        conn.execute("ROLLBACK")
+        raise
+    return row_count
+
+def _sqlite_type_for_dtype(dtype) -> str:
+    """
+    将pandas数据类型映射为SQLite列类型
+    """
+    import pandas as pd
+    
+    if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_integer_dtype(dtype):
+        return "INTEGER"
+    if pd.api.types.is_float_dtype(dtype):
+        return "REAL"
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return "TIMESTAMP"
+    return "TEXT"
+
+def _bulk_insert(conn: sqlite3.Connection, table_name: str, df: "pd.DataFrame") -> int:
+    """
+    将DataFrame批量写入SQLite（替换同名表）
+    """
+    import pandas as pd
+    
+    columns = []
+    values = []
+    for i, (name, dtype) in enumerate(df.dtypes.items()):
+        series = df.iloc[:, i]
+        columns.append((name, _sqlite_type_for_dtype(dtype)))
+        if pd.api.types.is_float_dtype(dtype) and not pd.api.types.is_extension_array_dtype(dtype):
+            # NaN 由 SQLite 写入为 NULL
+            values.append(series.tolist())
+        elif pd.api.types.is_datetime64_any_dtype(dtype):
+            # 与 DataFrame.to_sql 写入的文本一致：始终包含时分秒，微秒非零时追加小数部分
+            if series.dt.tz is None:
+                text = series.dt.strftime('%Y-%m-%d %H:%M:%S.%f').str.removesuffix('.000000')
+            else:
+                # 带时区的值保留UTC偏移（如 +08:00）
+                text = series.map(lambda v: str(v.to_pydatetime()))
+            values.append(text.where(series.notna(), None).tolist())
+        else:
+            values.append(series.astype(object).where(series.notna(), None).tolist())
+    return _bulk_load(conn, table_name, columns, [zip(*values)])
+
+def _sqlite_type_for_arrow(arrow_type) -> str:
+    """
+    将Arrow数据类型映射为SQLite列类型
+    """
+    import pyarrow as pa
+    
+    if pa.types.is_boolean(arrow_type) or pa.types.is_integer(arrow_type):
+        return "INTEGER"
+    if pa.types.is_floating(arrow_type) or pa.types.is_decimal(arrow_type):
+        return "REAL"
+    if pa.types.is_temporal(arrow_type):
+        return "TIMESTAMP"
+    return "TEXT"
+
+def _dtype_name(dtype) -> str:
+    """
+    pandas数据类型的名称，文本类型统一记为 "object"（与pandas版本无关）
+    """
+    import pandas as pd
+    
+    if pd.api.types.is_string_dtype(dtype):
+        return "object"
+    return str(dtype)
+
+def _dtype_name_for_arrow(arrow_type) -> str:
+    """
+    按转换为pandas后的数据类型命名Arrow列类型，与 _dtype_name 使用同一套名称
+    """
+    import pyarrow as pa
+    
+    if pa.types.is_boolean(arrow_type) or pa.types.is_integer(arrow_type):
+        return str(arrow_type)
+    if pa.types.is_floating(arrow_type):
+        return f"float{arrow_type.bit_width}"
+    if pa.types.is_timestamp(arrow_type):
+        if arrow_type.tz:
+            return f"datetime64[{arrow_type.unit}, {arrow_type.tz}]"
+        return f"datetime64[{arrow_type.unit}]"
+    return "object"
+
+def _arrow_batch_rows(batch):
+    """
+    将Arrow RecordBatch转换为可直接绑定的行元组
+    """
+    import pyarrow as pa
+    
+    values = []
+    for column in batch.columns:
+        if pa.types.is_temporal(column.type):
+            column = column.cast(pa.string())
+        elif pa.types.is_decimal(column.type):
+            column = column.cast(pa.float64())
+        values.append(column.to_pylist())
+    return zip(*values)
+
+def _bulk_insert_arrow(conn: sqlite3.Connection, table_name: str, schema, batches) -> int:
+    """
+    将Arrow RecordBatch流批量写入SQLite（替换同名表），不经过pandas
+    """
+    columns = [(field.name, _sqlite_type_for_arrow(field.type)) for field in schema]
+    return _bulk_load(conn, table_name, columns, (_arrow_batch_rows(batch) for batch in batches))
+
+def _import_csv_stream(conn: sqlite3.Connection, table_name: str, file_path, encoding: str, delimiter: str):
+    """
+    分块流式导入CSV/TSV，峰值内存只与单个数据块相关；编码失败时依次尝试常见编码
+
+    编码以外的解析错误（pyarrow.ArrowInvalid，如行字段数不一致）直接抛出，由调用方处理
+
+    Returns:
+        (Arrow schema, 导入行数)
+    """
+    import pyarrow as pa
+    
+    for enc in [encoding, 'utf-8', 'gbk', 'gb2312', 'latin-1']:
+        try:
+            try:
+                reader = open_csv_stream(file_path, enc, delimiter)
+                return reader.schema, _bulk_insert_arrow(conn, table_name, reader.schema, reader)
+            except pa.ArrowInvalid:
+                # 流式读取只按首个数据块推断列类型，后续数据不符时改为整体读取以统一推断
+                table = read_csv_table(file_path, enc, delimiter)
+                return table.schema, _bulk_insert_arrow(conn, table_name, table.schema, table.to_batches())
+        except UnicodeError:
+            continue
+    raise ValueError("无法确定文件编码")
+
+# numba 为可选依赖：None 表示尚未初始化，False 表示不可用
+_corr_kernel = None
+
+def _get_corr_kernel():
+    """
+    获取numba编译的逐对皮尔逊相关系数计算函数，numba不可用时返回None
+    """
+    global _corr_kernel
+    if _corr_kernel is None:
+        try:
+            import numpy as np
+            from numba import njit, prange
+        except ImportError:
+            _corr_kernel = False
+        else:
+            @njit(cache=True, parallel=True)
+            def pairwise_corr(X):
+                # X 形状为 (列数, 行数)，每列数据连续存放；每对列只使用两者均非NaN的行
+                k, n = X.shape
+                corr = np.empty((k, k))
+                for a in prange(k):
+                    corr[a, a] = 1.0
+                    for b in range(a + 1, k):
+                        count = 0
+                        sum_x = 0.0
+                        sum_y = 0.0
+                        for i in range(n):
+                            x = X[a, i]
+                            y = X[b, i]
+                            if not (np.isnan(x) or np.isnan(y)):
+                                count += 1
+                                sum_x += x
+                                sum_y += y
+                        r = np.nan
+                        if count > 1:
+                            mean_x = sum_x / count
+                            mean_y = sum_y / count
+                            sxx = 0.0
+                            syy = 0.0
+                            sxy = 0.0
+                            for i in range(n):
+                                x = X[a, i]
+                                y = X[b, i]
+                                if not (np.isnan(x) or np.isnan(y)):
+                                    dx = x - mean_x
+                                    dy = y - mean_y
+                                    sxx += dx * dx
+                                    syy += dy * dy
+                                    sxy += dx * dy
+                            denom = np.sqrt(sxx * syy)
+                            if denom > 0:
+                                r = sxy / denom
+                        corr[a, b] = r
+                        corr[b, a] = r
+                return corr
+            _corr_kernel = pairwise_corr
+    return _corr_kernel or None
+
 @mcp.tool()
 def import_file(file_path: str, table_name: Optional[str] = None, db_name: str = "default", 
                 sheet_name: Optional[str] = None, encoding: Optional[str] = None):
@@ -116,37 +521,41 @@ def import_file(file_path: str, table_name: Optional[str] = None, db_name: str =
             table_name = file_path.stem.replace(' ', '_').replace('-', '_')
         
         # 根据文件类型加载数据
+        # CSV/TSV 分块流式写入，Parquet 以 Arrow 批次直接写入，其余格式经 DataFrame 写入
         file_ext = file_path.suffix.lower()
+        df = None
+        row_count = None
         
-        if file_ext == '.csv':
+        if file_ext in ['.csv', '.tsv']:
+            import pyarrow as pa
+            
             enc = encoding or detect_file_encoding(str(file_path))
+            delimiter = '\t' if file_ext == '.tsv' else ','
+            conn = get_or_create_db(db_name)
             try:
-                df = pd.read_csv(file_path, encoding=enc)
-            except UnicodeDecodeError:
-                for enc in ['utf-8', 'gbk', 'gb2312', 'latin-1']:
-                    try:
-                        df = pd.read_csv(file_path, encoding=enc)
-                        break
-                    except:
-                        continue
-                else:
-                    raise ValueError("无法确定文件编码")
+                schema, row_count = _import_csv_stream(conn, table_name, file_path, enc, delimiter)
+            except pa.ArrowInvalid:
+                # pyarrow 无法解析的文件（如行字段数不一致）改用pandas读取，缺失字段以NaN补齐
+                df = read_csv_dataframe_with_fallback(file_path, enc, delimiter)
         
         elif file_ext in ['.xlsx', '.xls']:
+            import pandas as pd
+            
             if sheet_name:
                 df = pd.read_excel(file_path, sheet_name=sheet_name)
             else:
                 df = pd.read_excel(file_path)
         
         elif file_ext == '.json':
+            import pandas as pd
+            
             df = pd.read_json(file_path)
         
         elif file_ext == '.parquet':
-            df = pd.read_parquet(file_path)
-        
-        elif file_ext == '.tsv':
-            enc = encoding or detect_file_encoding(str(file_path))
-            df = pd.read_csv(file_path, sep='\t', encoding=enc)
+            import pyarrow.parquet as pq
+            
+            parquet_file = pq.ParquetFile(file_path)
+            schema, batches = parquet_file.schema_arrow, parquet_file.iter_batches()
         
         else:
             return {
@@ -157,20 +566,28 @@ def import_file(file_path: str, table_name: Optional[str] = None, db_name: str =
         # 获取数据库连接
         conn = get_or_create_db(db_name)
         
-        # 导入数据到SQLite
-        df.to_sql(table_name, conn, if_exists='replace', index=False)
+        # 导入数据到SQLite并获取基本统计信息
+        if df is not None:
+            _bulk_insert(conn, table_name, df)
+            stats = {
+                "rows": len(df),
+                "columns": len(df.columns),
+                "column_names": df.columns.tolist(),
+                "column_types": {name: _dtype_name(dtype) for name, dtype in df.dtypes.items()}
+            }
+        else:
+            if row_count is None:
+                row_count = _bulk_insert_arrow(conn, table_name, schema, batches)
+            stats = {
+                "rows": row_count,
+                "columns": len(schema),
+                "column_names": schema.names,
+                "column_types": {field.name: _dtype_name_for_arrow(field.type) for field in schema}
+            }
         
         # 记录表名
         _db_connections[db_name]['tables'].add(table_name)
         
-        # 获取基本统计信息
-        stats = {
-            "rows": len(df),
-            "columns": len(df.columns),
-            "column_names": df.columns.tolist(),
-            "column_types": df.dtypes.astype(str).to_dict()
-        }
-        
         return {
             "status": "success",
             "message": f"成功导入文件 {file_path.name}",
@@ -227,10 +644,11 @@ def describe_table(table_name: str, db_name: str = "default"):
             }
         
         conn = _db_connections[db_name]['connection']
+        table = _quote_identifier(table_name)
         
         # 获取表结构
         cursor = conn.cursor()
-        cursor.execute(f"PRAGMA table_info({table_name});")
+        cursor.execute(f"PRAGMA table_info({table});")
         columns_info = cursor.fetchall()
         
         if not columns_info:
@@ -240,22 +658,32 @@ def describe_table(table_name: str, db_name: str = "default"):
             }
         
         # 获取行数
-        cursor.execute(f"SELECT COUNT(*) FROM {table_name};")
+        cursor.execute(f"SELECT COUNT(*) FROM {table};")
         row_count = cursor.fetchone()[0]
         
         # 获取前5行数据样本
-        df_sample = pd.read_sql_query(f"SELECT * FROM {table_name} LIMIT 5", conn)
+        cursor.execute(f"SELECT * FROM {table} LIMIT 5")
+        sample_columns = [desc[0] for desc in cursor.description]
+        sample_data = [dict(zip(sample_columns, row)) for row in cursor.fetchmany(5)]
         
         # 获取数值列的统计信息
+        # 所有数值列的聚合在一次表扫描中完成
         numeric_stats = {}
-        for col in df_sample.select_dtypes(include=['number']).columns:
-            cursor.execute(f"SELECT MIN({col}), MAX({col}), AVG({col}) FROM {table_name};")
-            min_val, max_val, avg_val = cursor.fetchone()
-            numeric_stats[col] = {
-                "min": min_val,
-                "max": max_val,
-                "avg": round(avg_val, 2) if avg_val else None
-            }
+        numeric_cols = _numeric_columns(columns_info)
+        if numeric_cols:
+            agg_sql = "SELECT " + ", ".join(
+                f"MIN({q}), MAX({q}), AVG({q})"
+                for q in map(_quote_identifier, numeric_cols)
+            ) + f" FROM {table};"
+            cursor.execute(agg_sql)
+            row = cursor.fetchone()
+            for i, col in enumerate(numeric_cols):
+                min_val, max_val, avg_val = row[3 * i:3 * i + 3]
+                numeric_stats[col] = {
+                    "min": min_val,
+                    "max": max_val,
+                    "avg": round(avg_val, 2) if avg_val else None
+                }
         
         return {
             "status": "success",
@@ -263,7 +691,7 @@ def describe_table(table_name: str, db_name: str = "default"):
             "table": table_name,
             "row_count": row_count,
             "columns": [{"name": col[1], "type": col[2]} for col in columns_info],
-            "sample_data": df_sample.to_dict('records'),
+            "sample_data": sample_data,
             "numeric_statistics": numeric_stats
         }
         
@@ -284,6 +712,8 @@ def execute_sql(query: str, db_name: str = "default", limit: int = 100):
         limit: 结果限制条数
     """
     try:
+        import pandas as pd
+        
         if db_name not in _db_connections:
             return {
                 "status": "error",
@@ -312,7 +742,8 @@ def execute_sql(query: str, db_name: str = "default", limit: int = 100):
             "query": query,
             "row_count": len(df),
             "columns": df.columns.tolist(),
-            "data": df.to_dict('records')
+            # 按行返回值列表，列名只在 columns 中给出一次
+            "data": df.to_dict(orient='split')['data']
         }
         
     except Exception as e:
@@ -332,6 +763,9 @@ def generate_analysis_report(table_name: str, db_name: str = "default", analysis
         analysis_type: 分析类型 (basic, statistical, correlation)
     """
     try:
+        import numpy as np
+        import pandas as pd
+        
         if db_name not in _db_connections:
             return {
                 "status": "error",
@@ -339,65 +773,115 @@ def generate_analysis_report(table_name: str, db_name: str = "default", analysis
             }
         
         conn = _db_connections[db_name]['connection']
-        df = pd.read_sql_query(f"SELECT * FROM {table_name}", conn)
+        cursor = conn.cursor()
+        table = _quote_identifier(table_name)
+        
+        # 获取表结构，按SQLite类型亲和性区分数值列
+        cursor.execute(f"PRAGMA table_info({table});")
+        columns_info = cursor.fetchall()
+        if not columns_info:
+            return {
+                "status": "error",
+                "message": f"表 {table_name} 不存在"
+            }
+        columns = [col[1] for col in columns_info]
+        numeric_cols = _numeric_columns(columns_info)
+        
+        # 一次表扫描完成行数和各列非空计数
+        agg_exprs = ["COUNT(*)"] + [f"COUNT({_quote_identifier(col)})" for col in columns]
+        cursor.execute(f"SELECT {', '.join(agg_exprs)} FROM {table};")
+        row = cursor.fetchone()
+        row_count = row[0]
+        non_null_counts = dict(zip(columns, row[1:]))
+        
+        # 仅取样本行用于数据类型识别和内存估算
+        # 内存只按列缓冲区大小估算，不逐个统计字符串对象，object 列为近似值
+        df_sample = pd.read_sql_query(f"SELECT * FROM {table} LIMIT 1000", conn)
+        sample_memory = df_sample.memory_usage(deep=False).sum()
+        memory_usage = sample_memory / len(df_sample) * row_count if len(df_sample) else 0
         
         report = {
             "table": table_name,
             "analysis_type": analysis_type,
             "basic_info": {
-                "rows": len(df),
-                "columns": len(df.columns),
-                "memory_usage": f"{df.memory_usage(deep=True).sum() / 1024 / 1024:.2f} MB"
+                "rows": row_count,
+                "columns": len(columns),
+                "memory_usage": f"{memory_usage / 1024 / 1024:.2f} MB"
             }
         }
         
+        # 只读取数值列，供基础统计和相关性分析共用
+        # SQLite 类型亲和性不保证列中实际为数值（如全为NULL的列），只保留读出后为数值类型的列
+        numeric_df = None
+        if numeric_cols and analysis_type in ["basic", "statistical", "correlation"]:
+            numeric_sql = f"SELECT {', '.join(map(_quote_identifier, numeric_cols))} FROM {table}"
+            numeric_df = pd.read_sql_query(numeric_sql, conn).select_dtypes(include=[np.number])
+        
         if analysis_type in ["basic", "statistical", "correlation"]:
             # 基础统计
-            numeric_cols = df.select_dtypes(include=['number']).columns
-            if len(numeric_cols) > 0:
-                report["numeric_summary"] = df[numeric_cols].describe().to_dict()
+            if numeric_df is not None and len(numeric_df.columns) > 0:
+                report["numeric_summary"] = numeric_df.describe().to_dict()
             
             # 缺失值统计
-            missing_data = df.isnull().sum()
-            if missing_data.sum() > 0:
-                report["missing_values"] = missing_data[missing_data > 0].to_dict()
+            missing_data = {col: row_count - count for col, count in non_null_counts.items() if count < row_count}
+            if missing_data:
+                report["missing_values"] = missing_data
             
             # 数据类型统计
-            report["data_types"] = df.dtypes.value_counts().to_dict()
+            report["data_types"] = df_sample.dtypes.value_counts().to_dict()
         
         if analysis_type in ["statistical", "correlation"]:
-            # 重复值统计
-            duplicates = df.duplicated().sum()
+            # 数值列复用已读取的 numeric_df，只额外读取其余列
+            frames = [numeric_df] if numeric_df is not None else []
+            loaded_cols = set(numeric_df.columns) if numeric_df is not None else set()
+            other_cols = [col for col in columns if col not in loaded_cols]
+            if other_cols:
+                other_sql = f"SELECT {', '.join(map(_quote_identifier, other_cols))} FROM {table}"
+                frames.append(pd.read_sql_query(other_sql, conn))
+            table_df = pd.concat(frames, axis=1)
+            
+            # 重复值统计（NaN 视为相同值）
+            duplicates = int(table_df.duplicated().sum())
             if duplicates > 0:
                 report["duplicate_rows"] = duplicates
             
-            # 唯一值统计
-            unique_counts = {}
-            for col in df.columns:
-                unique_count = df[col].nunique()
-                if unique_count < len(df):  # 不是所有值都唯一
-                    unique_counts[col] = unique_count
+            # 唯一值统计（NULL 不计入）
+            nunique = table_df.nunique().to_dict()
+            unique_counts = {
+                col: int(nunique[col])
+                for col in columns
+                if nunique[col] < row_count  # 不是所有值都唯一
+            }
             if unique_counts:
                 report["unique_value_counts"] = unique_counts
         
         if analysis_type == "correlation":
-            # 相关性分析
-            numeric_df = df.select_dtypes(include=['number'])
-            if len(numeric_df.columns) > 1:
-                correlation_matrix = numeric_df.corr()
-                # 找出高相关性的列对
-                high_corr_pairs = []
-                for i in range(len(correlation_matrix.columns)):
-                    for j in range(i+1, len(correlation_matrix.columns)):
-                        corr_val = correlation_matrix.iloc[i, j]
-                        if abs(corr_val) > 0.7:  # 高相关性阈值
-                            high_corr_pairs.append({
-                                "column1": correlation_matrix.columns[i],
-                                "column2": correlation_matrix.columns[j],
-                                "correlation": round(corr_val, 3)
-                            })
-                if high_corr_pairs:
-                    report["high_correlations"] = high_corr_pairs
+            # 相关性分析，只使用数值列
+            if numeric_df is not None and len(numeric_df.columns) > 1:
+                # 去除常量列，避免相关系数出现除零
+                numeric_df = numeric_df.loc[:, numeric_df.std() > 0]
+                if len(numeric_df.columns) > 1:
+                    arr = numeric_df.to_numpy(dtype=np.float64, na_value=np.nan)
+                    if not np.isnan(arr).any():
+                        correlation_matrix = np.corrcoef(arr, rowvar=False)
+                    elif _get_corr_kernel() is not None:
+                        # 含缺失值时按列对逐对计算，numba 按列并行
+                        correlation_matrix = _get_corr_kernel()(np.ascontiguousarray(arr.T))
+                    else:
+                        correlation_matrix = numeric_df.corr().to_numpy()
+                    # 找出高相关性的列对（高相关性阈值0.7）
+                    cols = numeric_df.columns.to_numpy()
+                    ii, jj = np.where(np.triu(np.abs(correlation_matrix) > 0.7, k=1))
+                    high_corr_pairs = [
+                        {
+                            "column1": cols[i],
+                            "column2": cols[j],
+                            "correlation": round(float(correlation_matrix[i, j]), 3)
+                        }
+                        for i, j in zip(ii, jj)
+                    ]
+                    if high_corr_pairs:
+                        report["high_correlations"] = high_corr_pairs
         
         return {
             "status": "success",
@@ -423,6 +907,8 @@ def export_query_result(query: str, output_path: str, db_name: str = "default",
         format: 输出格式 (csv, excel, json)
     """
     try:
+        import pandas as pd
+        
         if db_name not in _db_connections:
             return {
                 "status": "error",
@@ -440,7 +926,7 @@ def export_query_result(query: str, output_path: str, db_name: str = "default",
         elif format.lower() == "excel":
             df.to_excel(output_path, index=False)
         elif format.lower() == "json":
-            df.to_json(output_path, orient='records', indent=2)
+            df.to_json(output_path, orient='split', index=False, indent=2)
         else:
             return {
                 "status": "error",
@@ -482,7 +968,7 @@ def clean_database(db_name: str = "default"):
         
         # 删除所有表
         for table in tables:
-            cursor.execute(f"DROP TABLE IF EXISTS {table};")
+            cursor.execute(f"DROP TABLE IF EXISTS {_quote_identifier(table)};")
         
         conn.commit()
         _db_connections[db_name]['tables'].clear()